@@ -1,23 +1,68 @@
 from __future__ import annotations
 import asyncio
+import atexit
 import datetime as dt
+import functools
+import io
+import itertools
+import json
 import multiprocessing as mp
 import os
+import random
+import re
 import selectors
+import shutil
+import ssl
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from netrc import netrc
 from pathlib import Path
 from typing import Optional, Union
-from urllib.parse import urlparse
+from urllib.parse import unquote, urlparse
 
-import browser_cookie3 as bc
+import certifi
 import httpx
 import nest_asyncio
+import numpy as np
 import requests
-from dateutil.parser import parse
+from requests.adapters import HTTPAdapter
 from tqdm.auto import tqdm
 
-nest_asyncio.apply()
+#: default number of bytes read from the response body per iteration
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+# TLS settings shared by the clients of this module, which saves loading the
+# CA bundle for every client
+_SSL_CTX = ssl.create_default_context(cafile=certifi.where())
+_SSL_CTX.options |= ssl.OP_NO_COMPRESSION
+# buffer size of the output file, writes are coalesced until it is filled
+_WRITE_BUFFER_SIZE = 1 << 20
+# a file is split into parts of at least this size for parallel downloading
+_MIN_PART_SIZE = 1 << 22
+# number of bytes received before the progress bar is updated
+_PBAR_UPDATE_SIZE = 1 << 19
+# timeouts of the httpx clients created here, a client given by the caller
+# keeps its own. A stalled server fails after 120 seconds without data, while
+# waiting for a connection from the pool can't time out, as the pool may be
+# busy with the other downloads for long
+_TIMEOUT = httpx.Timeout(120.0, connect=10.0, pool=None)
+# maximum seconds waited before retrying a failed request
+_MAX_RETRY_DELAY = 30
+# seconds an idle connection is kept alive, long enough to be reused by the
+# next file from the same host
+_KEEPALIVE_EXPIRY = 15.0
+# files with less bytes to download than this size are not preallocated
+_PREALLOCATE_SIZE = 1 << 22
+# marker of a download in progress whose file is allocated in advance, which
+# may contain holes. It records the size of file before the download, which
+# is kept if the download is interrupted
+_PARTS_SUFFIX = ".parts"
+# sidecar recording the validators of a file being downloaded, which make
+# sure it is resumed with the same file, and its size once it's complete
+_META_SUFFIX = ".meta.json"
 
 
 def get_url_host(url):
@@ -32,10 +77,35 @@ def get_url_host(url):
     return host
 
 
+def _netrc_path():
+    """path of the .netrc file, which can be set by the NETRC variable"""
+    return Path(os.environ.get("NETRC", "~/.netrc")).expanduser()
+
+
 def get_netrc_auth(url):
-    """Returns the Requests tuple auth for a given url from .netrc"""
-    host = get_url_host(url)
-    _netrc = Netrc().authenticators(host)
+    """Returns the Requests tuple auth for a given url or host from .netrc"""
+    # a host without scheme has no netloc
+    host = get_url_host(url) or url
+    netrc_file = _netrc_path()
+    try:
+        st = os.stat(netrc_file)
+    except FileNotFoundError:
+        # don't create an empty file by loading it
+        return None
+    # the cache is invalidated once the file is changed. The size and inode
+    # catch the changes within the coarse mtime of some file systems
+    version = (st.st_mtime_ns, st.st_size, st.st_ino)
+    return _get_netrc_auth(host, netrc_file, version)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_netrc(netrc_file, version):
+    return Netrc(netrc_file)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_netrc_auth(host, netrc_file, version):
+    _netrc = _load_netrc(netrc_file, version).authenticators(host)
 
     if _netrc:
         # Return with login / password
@@ -48,7 +118,7 @@ class Netrc(netrc):
 
     def __init__(self, file: Optional[Union[str, Path]] = None):
         if file is None:
-            file = Path("~/.netrc").expanduser()
+            file = _netrc_path()
         else:
             file = Path(file)
         self.file = file
@@ -58,14 +128,29 @@ class Netrc(netrc):
         netrc.__init__(self, file)
 
     def _info_to_file(self):
-        rep = self.__repr__()
-        with open(self.file, "w") as f:
+        """rewrite the file atomically with the records in memory"""
+        tmp = self.file.with_name(self.file.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w") as f:
+            f.write(self.__repr__())
+        if self.file.exists():
+            shutil.copymode(self.file, tmp)
+        os.replace(tmp, self.file)
+
+    def _append_to_file(self, host):
+        """append the record of host to the end of file"""
+        login, account, password = self.hosts[host]
+        rep = f"machine {host}\n\tlogin {login}\n"
+        if account:
+            rep += f"\taccount {account}\n"
+        rep += f"\tpassword {password}\n"
+        with open(self.file, "a+") as f:
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                if f.read(1) != "\n":
+                    rep = "\n" + rep
             f.write(rep)
 
-    def _update_info(self):
-        with open(self.file) as fp:
-            self._parse(self.file, fp, False)
-
     def add(self, host, login, password, account=None, overwrite=False):
         """add a record
 
@@ -76,175 +161,677 @@ class Netrc(netrc):
                 f">>> Warning: {host} existed, nothing will be done."
                 + " If you want to overwrite the existed record, set overwrite=True"
             )
+        elif host in self.hosts:
+            self.hosts.update({host: (login, account, password)})
+            self.flush()
         else:
+            # a new record is appended, no need to rewrite and parse the file
             self.hosts.update({host: (login, account, password)})
-            self._info_to_file()
-            self._update_info()
+            self._append_to_file(host)
 
     def remove(self, host):
         """remove a record by host"""
         self.hosts.pop(host)
-        self._info_to_file()
-        self._update_info()
+        self.flush()
 
     def clear(self):
         """remove all records"""
         self.hosts = {}
+        self.flush()
+
+    def flush(self):
+        """write all records in memory to the .netrc file"""
         self._info_to_file()
-        self._update_info()
+
+
+# RFC 6266 filename parameters of Content-Disposition header, the extended
+# one (filename*=UTF-8''%e2%82%ac.txt) is percent-encoded with a charset
+_CD_FILENAME_EXT_RE = re.compile(
+    r"filename\*\s*=\s*([\w!#$%&+^`{}~-]*)'[^']*'([^;\s]+)", re.I
+)
+_CD_FILENAME_RE = re.compile(
+    r"""filename\s*=\s*(?:"([^"]*)"|'([^']*)'|([^;\s]+))""", re.I
+)
 
 
 def _parse_file_name(response):
     """parse the file_name from the headers of web response or url"""
-
-    if "Content-disposition" in response.headers:
-        file_name = (
-            response.headers["Content-disposition"]
-            .split("filename=")[1]
-            .strip('"')
-            .strip("'")
-        )
-    else:
-        file_name = os.path.basename(urlparse(str(response.url)).path)
+    file_name = None
+    content_disposition = response.headers.get("Content-disposition")
+    if content_disposition:
+        match = _CD_FILENAME_EXT_RE.search(content_disposition)
+        if match:
+            charset, value = match.groups()
+            try:
+                file_name = unquote(value, encoding=charset or "utf-8")
+            except LookupError:
+                file_name = unquote(value)
+        else:
+            match = _CD_FILENAME_RE.search(content_disposition)
+            if match:
+                file_name = next(g for g in match.groups() if g is not None)
+        if file_name:
+            # never write outside of the folder
+            file_name = os.path.basename(file_name.strip())
+    if not file_name:
+        # httpx.URL is parsed already, requests gives a str. The path is kept
+        # percent-encoded as before
+        url = response.url
+        if isinstance(url, httpx.URL):
+            path = url.raw_path.split(b"?", 1)[0].decode("ascii")
+        else:
+            path = urlparse(url).path
+        file_name = os.path.basename(path)
     return file_name
 
 
+_UNITS = (("", 1), ("k", 1 << 10), ("M", 1 << 20), ("G", 1 << 30), ("T", 1 << 40))
+
+
 def _unit_formater(size, suffix):
-    prefixs = ["", "k", "M", "G", "T"]
-    idx = 0
-    while size / 1024 >= 1:
-        size = size / 1024
-        idx += 1
-        if idx == 4:
-            break
+    # every 10 bits of the size is one step of the prefixes
+    idx = max(0, min(4, (int(size).bit_length() - 1) // 10))
+    prefix, div = _UNITS[idx]
+    return f"{size / div:.2f}{prefix}{suffix}"
+
+
+def _new_pbar(file_name, total=None, initial=0):
+    """progress bar of downloading a file. total is None if the size is unknown"""
+    return tqdm(
+        initial=initial,
+        total=total,
+        unit="B",
+        unit_scale=True,
+        dynamic_ncols=True,
+        mininterval=0.25,
+        desc=Path(file_name).name,
+    )
 
-    return f"{size:.2f}{prefixs[idx]}{suffix}"
 
+def _new_total_pbar(desc, iterable=None, total=None):
+    """progress bar counting the downloaded files. It is refreshed at most
+    every 0.25 seconds, however fast the files are finished"""
+    return tqdm(
+        iterable,
+        total=total,
+        desc=">>> Total | " + desc.title(),
+        unit="files",
+        dynamic_ncols=True,
+        mininterval=0.25,
+        smoothing=0.1,
+    )
 
-def _new_file_from_web(r, file_path):
-    """whether have new file from the website"""
+
+def _new_file_from_web(r, local_stat):
+    """whether have new file from the website. local_stat is the stat result
+    of the local file, or None if it doesn't exist"""
+    last_modified = r.headers.get("Last-Modified")
+    if local_stat is None or last_modified is None:
+        return False
     try:
-        time_remote = parse(r.headers.get("Last-Modified"))
-        time_local = dt.datetime.fromtimestamp(
-            os.path.getmtime(file_path), dt.timezone.utc
-        )
-        return time_remote > time_local
-    except:
+        # HTTP-date of RFC 7231, e.g. "Wed, 21 Oct 2015 07:28:00 GMT"
+        time_remote = parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        # malformed date
         return False
+    if time_remote.tzinfo is None:
+        time_remote = time_remote.replace(tzinfo=dt.timezone.utc)
+    time_local = dt.datetime.fromtimestamp(local_stat.st_mtime, dt.timezone.utc)
+    return time_remote > time_local
+
+
+def _get_file_path(folder, file_name):
+    if folder is not None:
+        return os.path.join(folder, file_name)
+    return os.path.abspath(file_name)
+
+
+def _stat_or_none(file_path):
+    """stat result of file, or None if it doesn't exist. A single stat call
+    gives both the size and the modification time"""
+    try:
+        return os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+
+def _get_local_size(file_path):
+    st = _stat_or_none(file_path)
+    return st.st_size if st is not None else 0
+
+
+def _mark_unfinished(file_path, offset):
+    """mark file as allocated in advance, with the offset up to which it was
+    written before"""
+    with open(file_path + _PARTS_SUFFIX, "w") as f:
+        f.write(str(offset))
+
+
+def _remove_unfinished_parts(file_path):
+    """truncate the file left by an interrupted download that was allocated in
+    advance or written in parts to the size it had before, so it is resumed
+    from there. The file is removed if the marker has no valid offset"""
+    marker = file_path + _PARTS_SUFFIX
+    try:
+        with open(marker) as f:
+            offset = f.read()
+    except FileNotFoundError:
+        return
+    try:
+        if offset.strip().isdigit():
+            if _get_local_size(file_path) > int(offset):
+                os.truncate(file_path, int(offset))
+        else:
+            os.remove(file_path)
+    except FileNotFoundError:
+        pass
+    os.remove(marker)
+
+
+def _prepare_local_file(file_path):
+    """drop the unfinished parts of file and return its stat result, or None
+    if it doesn't exist"""
+    _remove_unfinished_parts(file_path)
+    return _stat_or_none(file_path)
+
+
+def _read_meta(file_path):
+    """the record in the sidecar of file, or None if there is no valid one"""
+    try:
+        with open(file_path + _META_SUFFIX) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if isinstance(meta, dict) else None
+
+
+def _write_meta(headers, file_path, complete=True):
+    """record the validators of file from the response headers in its
+    sidecar. The size is recorded only if the file is complete"""
+    meta = {
+        "size": _get_local_size(file_path) if complete else None,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+    with open(file_path + _META_SUFFIX, "w") as f:
+        json.dump(meta, f)
+
+
+def _remove_meta(file_path):
+    try:
+        os.remove(file_path + _META_SUFFIX)
+    except FileNotFoundError:
+        pass
 
 
+def _save_validators(r, state, file_path):
+    """record the validators of the file to be downloaded, so that it can be
+    resumed only if it's unchanged on the server"""
+    resumable = state.support_resume or _accepts_ranges(r)
+    if resumable and ("ETag" in r.headers or "Last-Modified" in r.headers):
+        _write_meta(r.headers, file_path, complete=False)
+
+
+def _finish_meta(headers, file_path, skip_complete):
+    """record the complete file if skip_complete is set, otherwise remove the
+    validators saved for resuming it"""
+    if skip_complete:
+        _write_meta(headers, file_path)
+    else:
+        _remove_meta(file_path)
+
+
+def _is_recorded_complete(file_path):
+    """whether the sidecar of file records it as complete with the same size"""
+    meta = _read_meta(file_path)
+    size = meta.get("size") if meta else None
+    return isinstance(size, int) and size > 0 and size == _get_local_size(file_path)
+
+
+def _range_headers(file_path, range_start):
+    """headers resuming file from range_start. With If-Range, the server sends
+    the rest of file only if it's unchanged, otherwise the whole new file"""
+    headers = {"Range": f"bytes={range_start}-"}
+    meta = _read_meta(file_path) or {}
+    etag = meta.get("etag")
+    # weak ETags can't be used in If-Range
+    validator = etag if etag and not etag.startswith("W/") else None
+    validator = validator or meta.get("last_modified")
+    if validator:
+        headers["If-Range"] = validator
+    return headers
+
+
+def _pwrite_all(fd, data, offset):
+    """write all data into fd at given offset"""
+    view = memoryview(data)
+    while view:
+        n = os.pwrite(fd, view, offset)
+        view = view[n:]
+        offset += n
+
+
+class _RawAppender(io.RawIOBase):
+    """raw file writing from the end of an existing file. It is opened without
+    O_APPEND, as the offset needs no atomic update with a single writer. The
+    kernel is advised of the sequential writes, and to drop the pages of file
+    from cache once it is closed, so large downloads won't evict the hot ones.
+    """
+
+    def __init__(self, file_path, size=None):
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(file_path, flags, 0o666)
+        self._offset = os.lseek(self._fd, 0, os.SEEK_END)
+        self._marker = None
+        if size is not None and size - self._offset >= _PREALLOCATE_SIZE:
+            self._preallocate(file_path, size)
+        self._advise("POSIX_FADV_SEQUENTIAL")
+
+    def _preallocate(self, file_path, size):
+        """allocate the rest of file at once, instead of block by block while
+        writing. The file has the full size until it is closed, so it is marked
+        unfinished meanwhile"""
+        if not hasattr(os, "posix_fallocate"):
+            return
+        marker = file_path + _PARTS_SUFFIX
+        _mark_unfinished(file_path, self._offset)
+        try:
+            os.posix_fallocate(self._fd, self._offset, size - self._offset)
+        except OSError:
+            # not supported by the file system
+            os.remove(marker)
+            return
+        self._marker = marker
+
+    def _advise(self, advice):
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(self._fd, 0, 0, getattr(os, advice))
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        n = os.write(self._fd, b)
+        self._offset += n
+        return n
+
+    def fileno(self):
+        return self._fd
+
+    def close(self):
+        if not self.closed:
+            try:
+                if self._marker is not None:
+                    # drop the allocated space that wasn't written
+                    os.ftruncate(self._fd, self._offset)
+                    os.remove(self._marker)
+                self._advise("POSIX_FADV_DONTNEED")
+            finally:
+                os.close(self._fd)
+        super().close()
+
+
+class _ProgressWriter(io.BufferedWriter):
+    """buffered writer updating the progress bar every _PBAR_UPDATE_SIZE bytes,
+    as updating it per chunk costs more than writing the chunk to buffer"""
+
+    def __init__(self, raw, buffer_size, pbar):
+        super().__init__(raw, buffer_size)
+        self._pbar = pbar
+        self._pending = 0
+
+    def write(self, b):
+        n = super().write(b)
+        self._pending += n
+        if self._pending >= _PBAR_UPDATE_SIZE:
+            self._pbar.update(self._pending)
+            self._pending = 0
+        return n
+
+    def close(self):
+        if self._pending:
+            self._pbar.update(self._pending)
+            self._pending = 0
+        super().close()
+
+
+def _open_for_append(file_path, pbar=None, size=None):
+    """open file to append the downloaded data with a write buffer. The bytes
+    written are counted by pbar if given, and the file is allocated to size"""
+    raw = _RawAppender(file_path, size)
+    if pbar is None:
+        return io.BufferedWriter(raw, _WRITE_BUFFER_SIZE)
+    return _ProgressWriter(raw, _WRITE_BUFFER_SIZE, pbar)
+
+
+def _sync_file(f):
+    """flush the buffer of file object and force the OS to write it to disk"""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _new_httpx_client(limits=None, http2=True):
+    """create a httpx.Client() using HTTP/2 by default, which multiplexes the
+    requests to the same host over one connection"""
+    if limits is None:
+        limits = httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=100,
+            keepalive_expiry=_KEEPALIVE_EXPIRY,
+        )
+    return httpx.Client(
+        http2=http2,
+        limits=limits,
+        timeout=_TIMEOUT,
+        verify=_SSL_CTX,
+    )
+
+
+def _parts_client_settings(client):
+    """settings of client kept by the client requesting the range parts"""
+    return dict(
+        auth=client.auth,
+        headers=client.headers,
+        cookies=client.cookies,
+        timeout=client.timeout,
+        verify=_SSL_CTX,
+    )
+
+
+@contextmanager
+def _parts_client(client, r, nparts):
+    """client requesting the range parts of response. HTTP/2 would multiplex
+    the parts over one connection, so the parts of a HTTP/2 response are
+    requested over their own HTTP/1.1 connections"""
+    if r.http_version != "HTTP/2":
+        yield client
+        return
+    limits = httpx.Limits(max_connections=nparts)
+    with httpx.Client(limits=limits, **_parts_client_settings(client)) as client:
+        yield client
+
+
+@asynccontextmanager
+async def _async_parts_client(client, r, nparts):
+    """async version of :func:`_parts_client`"""
+    if r.http_version != "HTTP/2":
+        yield client
+        return
+    limits = httpx.Limits(max_connections=nparts)
+    async with httpx.AsyncClient(
+        limits=limits, **_parts_client_settings(client)
+    ) as client:
+        yield client
+
+
+def _new_requests_session(pool_size=100, max_retries=3):
+    """create a requests.Session() with a connection pool of given size mounted"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # "Connection: close" would disable the reusing of connections
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+@functools.lru_cache(maxsize=2)
+def _get_default_client(engine):
+    """client used by :func:`download_data` if none is given, which is shared
+    by the calls so that their connections are reused"""
+    if engine == "requests":
+        return _new_requests_session()
+    return _new_httpx_client()
+
+
+if hasattr(os, "register_at_fork"):
+    # connections of the parent process can't be shared by a forked child
+    os.register_at_fork(after_in_child=_get_default_client.cache_clear)
+
+
+@functools.lru_cache(maxsize=2)
 def _get_cookiejar(authorize_from_browser):
+    # loading cookies reads the databases of all browsers, so it is done once
     cj = None
     if authorize_from_browser:
+        # imported only here, as it is slow to import and rarely used
+        import browser_cookie3 as bc
+
         try:
             cj = bc.load()
-        except:
+        except Exception as e:
             raise EnvironmentError(
                 "Could not load cookie from browser. "
                 "Please login in website via browser before run this code"
                 "\n  So far the following browsers are supported: "
                 "Chrome,Firefox, Opera, Edge, Chromium"
-            )
+            ) from e
     return cj
 
 
-def _handle_status(r, url, local_size, file_name, file_path):
-    # returns (True, '') : downloaded entirely
-    # returns (False,'') : error! break download
-    # returns (False, url) : 301,302
-    # returns None: continue to download
+def clear_cookie_cache():
+    """Clear the cookies loaded from browser. The cookies are loaded once and
+    reused by all downloads, call this function after logging in to website
+    again to load the new ones.
+    """
+    _get_cookiejar.cache_clear()
+
+
+@dataclass
+class _DownloadState:
+    """state of a single download, returned by :func:`_handle_status`"""
+
+    #: one of "done", "error", "request" (again from url) and "continue"
+    action: str
+    url: str = ""
+    support_resume: bool = False
+    remote_size: Optional[int] = None
+    pbar: Optional[tqdm] = None
 
-    global support_resume, pbar, remote_size
+
+def _handle_status(r, url, local_stat, file_name, file_path):
+    """check the response and the local file, and return the state of download.
+    local_stat is the stat result of the local file, or None if it doesn't exist"""
+    state = _DownloadState("continue")
+    local_size = local_stat.st_size if local_stat is not None else 0
 
     if r.status_code in [206, 416]:
-        support_resume = True
-        remote_size = int(r.headers["Content-Range"].rsplit("/")[-1])
+        state.support_resume = True
+        # Content-Range: "bytes 0-4/1234" for 206 and "bytes */1234" for 416
+        total = r.headers.get("Content-Range", "").rsplit("/")[-1]
+        state.remote_size = int(total) if total.isdigit() else local_size
 
-        # init process bar
-        if _new_file_from_web(r, file_path):
+        if _new_file_from_web(r, local_stat):
             tqdm.write(
                 f"There is a new file from {url}"
                 f"{file_name} is ready to be downloaded again"
             )
             os.remove(file_path)
-        elif local_size < remote_size:
-            pbar = tqdm(
-                initial=local_size,
-                total=remote_size,
-                unit="B",
-                unit_scale=True,
-                dynamic_ncols=True,
-                desc=Path(file_name).name,
+            return _DownloadState("request", url)
+        elif local_size > state.remote_size:
+            tqdm.write(
+                "Detected the local file is larger than the server file. "
+                " Prepare to remove local the file and redownload..."
             )
+            os.remove(file_path)
+            return _DownloadState("request", url)
+        elif local_size < state.remote_size:
+            # init process bar
+            state.pbar = _new_pbar(file_name, state.remote_size, local_size)
         else:
             tqdm.write(f"{file_name} was downloaded entirely. skiping download")
-            return True, ""
+            return _DownloadState("done")
     elif r.status_code == 200:
+        if local_stat is not None and "If-Range" in r.request.headers:
+            # the whole file is sent as it's changed since partly downloaded
+            tqdm.write(
+                f"  {file_name} has changed on the server since it was"
+                " partly downloaded. Prepare to redownload it..."
+            )
+            os.remove(file_path)
+            local_stat, local_size = None, 0
         # know the total size, then delete the file that wasn't downloaded entirely and redownload it.
         if "Content-length" in r.headers:
-            remote_size = int(r.headers["Content-length"])
+            state.remote_size = int(r.headers["Content-length"])
 
-            if _new_file_from_web(r, file_path):
+            if _new_file_from_web(r, local_stat):
                 tqdm.write(
                     f"There is a new file from {url}"
                     f"{file_name} is ready to be downloaded again"
                 )
                 os.remove(file_path)
-            elif 0 < local_size < remote_size:
+            elif 0 < local_size < state.remote_size:
                 tqdm.write(f"  Detect {file_name} wasn't downloaded entirely")
                 tqdm.write(
                     "  The website not supports resuming breakpoint."
                     " Prepare to remove the local file and redownload..."
                 )
                 os.remove(file_path)
-            elif local_size > remote_size:
+            elif local_size > state.remote_size:
                 tqdm.write(
                     "Detected the local file is larger than the server file. "
                     " Prepare to remove local the file and redownload..."
                 )
                 os.remove(file_path)
-            elif local_size == remote_size:
+            elif local_size == state.remote_size:
                 tqdm.write(f"{file_name} was downloaded entirely. skiping download")
-                return True, ""
+                return _DownloadState("done")
         # don't know the total size, warning user if detect the file was downloaded.
         else:
-            if os.path.exists(file_path):
+            if local_stat is not None:
                 tqdm.write(
                     f">>> Warning: Detect the {file_name} was downloaded,"
                     " but can't parse the it's size from website\n"
                     f"    If you know it wasn't downloaded entirely, delete "
                     "it and redownload it again. skiping download..."
                 )
-                return True, ""
+                return _DownloadState("done")
+        state.pbar = _new_pbar(file_name, state.remote_size)
     elif r.status_code == 202:
         tqdm.write(
             ">>> The server has accepted your request but has not yet processed it. "
             "Please redownload it later"
         )
-        return False, ""
+        return _DownloadState("error")
     elif r.status_code in [301, 302]:
         url_new = r.headers["Location"]
         tqdm.write(f">>> Waring: the website has redirected to {url_new}")
-        return False, url_new
+        return _DownloadState("request", url_new)
     elif r.status_code == 401:
-        netrc_file = Path("~/.netrc").expanduser()
+        netrc_file = _netrc_path()
         tqdm.write(
             f">>> Authorization failed! Please check your username and password in {netrc_file}. "
             "More details about .netrc file: https://data-downloader.readthedocs.io/en/latest/user_guide/netrc.html"
             "\n Or authorizing by browser and set the parameter `authorize_from_browser` to `True`"
         )
-        return False, ""
+        return _DownloadState("error")
     elif r.status_code == 403:
         tqdm.write(
             ">>> Forbidden! Access to the requested resource was denied by the server"
         )
-        return False, ""
+        return _DownloadState("error")
     else:
         tqdm.write(
             f'  Download file from "{url}" failed,'
             f" The service returns the HTTP Status Code: {r.status_code}"
         )
-        return False, ""
+        return _DownloadState("error")
+    return state
+
+
+def _retry_delay(r, attempt):
+    """seconds to wait before retrying the failed response r. It is given by
+    the Retry-After header of server if any, otherwise grows exponentially
+    with the attempt, with jitter to spread the retries of many downloads"""
+    retry_after = r.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(int(retry_after), _MAX_RETRY_DELAY)
+    return min(2**attempt, _MAX_RETRY_DELAY) + random.random()
+
+
+def _accepts_ranges(r):
+    return r.headers.get("Accept-Ranges", "").lower() == "bytes"
+
+
+def _needs_range_request(r, range_start, local_size):
+    """whether to request again from the end of local file, whose size was
+    unknown when the request was sent"""
+    if range_start == local_size:
+        return False
+    if r.status_code == 206:
+        return True
+    # resume the local file instead of downloading it again
+    content_length = r.headers.get("Content-length")
+    return (
+        r.status_code == 200
+        and _accepts_ranges(r)
+        and content_length is not None
+        and local_size != int(content_length)
+    )
+
+
+def _count_parts(r, state, nparts, local_size):
+    """number of parts the rest of file will be downloaded in"""
+    if not (state.support_resume or _accepts_ranges(r)):
+        return 1
+    if state.remote_size is None or not hasattr(os, "pwrite"):
+        return 1
+    return max(1, min(nparts, (state.remote_size - local_size) // _MIN_PART_SIZE))
+
+
+def _open_parts_file(file_path, start, size):
+    """open file for writing the parts of a parallel download from start, with
+    the space of given size allocated"""
+    # the marker is removed only if all parts are written
+    _mark_unfinished(file_path, start)
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT, 0o666)
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # not supported by the platform or file system
+        os.ftruncate(fd, size)
+    return fd
+
+
+def _write_range_sync(chunks, fd, start, size, pbar):
+    """write the first size bytes of chunks into fd at offset start"""
+    buffer = bytearray()
+    end = start + size
+    for chunk in chunks:
+        if len(chunk) > end - start - len(buffer):
+            chunk = chunk[: end - start - len(buffer)]
+        buffer += chunk
+        if len(buffer) >= _WRITE_BUFFER_SIZE or start + len(buffer) >= end:
+            pbar.update(len(buffer))
+            _pwrite_all(fd, buffer, start)
+            start += len(buffer)
+            buffer.clear()
+    if start < end:
+        raise IOError(f"incomplete range: {end - start} bytes missing")
+
+
+def _download_parts_sync(open_range, file_path, start, end, nparts, pbar, fsync):
+    """download bytes [start, end) into file with nparts range requests in
+    threads. open_range(start, end) returns a context manager of the chunks of
+    the range."""
+    bounds = [start + (end - start) * i // nparts for i in range(nparts + 1)]
+    fd = _open_parts_file(file_path, start, end)
+
+    def download_part(i):
+        part_start, part_end = bounds[i], bounds[i + 1]
+        with open_range(part_start, part_end) as chunks:
+            _write_range_sync(chunks, fd, part_start, part_end - part_start, pbar)
+
+    try:
+        with ThreadPoolExecutor(nparts) as executor:
+            list(executor.map(download_part, range(nparts)))
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.remove(file_path + _PARTS_SUFFIX)
 
 
 def _download_data_httpx(
@@ -255,6 +842,10 @@ def _download_data_httpx(
     follow_redirects=True,
     retry=0,
     authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
 ):
     """Download a single file.
 
@@ -274,106 +865,140 @@ def _download_data_httpx(
         the file name. If None, will parse from web response or url.
         file_name can be the absolute path if folder is None.
     client: httpx.Client() object
-        client maintaining connection. Default None
+        client maintaining connection. If None, a client shared by the calls
+        without a client is used, which keeps connections alive between them.
+        Default None
     follow_redirects: bool
         Enables or disables HTTP redirects
     retry: int
         number of reconnection when status code is 503
+    chunk_size: int
+        number of bytes read from the response per iteration.
+        Default is :data:`DOWNLOAD_CHUNK_SIZE` (64 KiB)
+    fsync: bool
+        whether to call ``os.fsync`` once the file is written, which makes
+        the downloaded data durable on crash. Default is False
+    nparts: int
+        number of concurrent range requests a large file is split into, which
+        speeds up downloading from servers throttling each connection. Only
+        used if the server supports resuming and ``os.pwrite`` is available.
+        The parts of a HTTP/2 download are requested over HTTP/1.1 connections
+        of their own, as HTTP/2 would multiplex them over one connection
+    skip_complete: bool
+        whether to skip the files recorded as complete by a previous run
+        without requesting them, so a newer file on the server is not
+        detected. The request is only avoided if file_name is given, as the
+        name is otherwise parsed from the response. Default is False
     """
     # init parameters
-    global support_resume, pbar, remote_size
-
-    support_resume = False
-    headers = {"Range": "bytes=0-4"}
     if not client:
-        client = httpx
+        client = _get_default_client("httpx")
 
     cj = _get_cookiejar(authorize_from_browser)
 
-    r = client.get(
-        url, headers=headers, timeout=120, follow_redirects=follow_redirects, cookies=cj
-    )
-    r.close()
-
-    if file_name is None:
-        file_name = _parse_file_name(r)
-
-    if folder is not None:
-        file_path = os.path.join(folder, file_name)
-    else:
-        file_path = os.path.abspath(file_name)
-
-    local_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-
-    result = _handle_status(r, url, local_size, file_name, file_path)
-    if result:
-        status, url_new = result
-        if status:  # downloaded entirely
-            return True
-        elif status == False:
-            if url_new:  # 301,302
-                return _download_data_httpx(
-                    url_new,
-                    folder=folder,
-                    file_name=file_name,
-                    authorize_from_browser=authorize_from_browser,
-                    follow_redirects=True,
-                    client=client,
-                )
-            elif retry > 0:
-                return _download_data_httpx(
-                    url,
-                    folder=folder,
-                    file_name=file_name,
-                    authorize_from_browser=authorize_from_browser,
-                    client=client,
-                    retry=retry - 1,
-                )
-            else:  # error! break download
+    attempt = 0
+    while True:
+        local_stat = None
+        if file_name is not None:
+            file_path = _get_file_path(folder, file_name)
+            if skip_complete and _is_recorded_complete(file_path):
+                tqdm.write(f"{file_name} was downloaded entirely. skiping download")
+                return True
+            local_stat = _prepare_local_file(file_path)
+        local_size = local_stat.st_size if local_stat is not None else 0
+        range_start = local_size
+        # only resuming needs a range, which some servers handle badly
+        headers = _range_headers(file_path, range_start) if range_start else {}
+
+        with client.stream(
+            "GET",
+            url,
+            headers=headers,
+            follow_redirects=follow_redirects,
+            cookies=cj,
+        ) as r:
+            if file_name is None:
+                file_name = _parse_file_name(r)
+                file_path = _get_file_path(folder, file_name)
+                local_stat = _prepare_local_file(file_path)
+                local_size = local_stat.st_size if local_stat is not None else 0
+
+            if _needs_range_request(r, range_start, local_size):
+                # the range was requested before the size of local file is known
+                continue
+
+            state = _handle_status(r, url, local_stat, file_name, file_path)
+            if state.action == "done":  # downloaded entirely
+                _finish_meta(r.headers, file_path, skip_complete)
+                return True
+            elif state.action == "request":  # 301,302 or local file removed
+                url = state.url
+                follow_redirects = True
+                continue
+            elif state.action == "error":
+                if retry > 0:
+                    retry -= 1
+                    r.close()
+                    time.sleep(_retry_delay(r, attempt))
+                    attempt += 1
+                    continue
+                # error! break download
                 return False
-
-    # begin downloading
-    if support_resume:
-        headers["Range"] = f"bytes={local_size}-{remote_size}"
-    else:
-        headers = None
-
-    with client.stream("GET", url, headers=headers, timeout=120, cookies=cj) as r:
-        with open(file_path, "ab") as f:
-            time_start_realtime = time_start = time.time()
-            for chunk in r.iter_raw():
-                if chunk:
-                    size_add = len(chunk)
-                    local_size += size_add
-                    f.write(chunk)
-                    f.flush()
-                if support_resume:
-                    pbar.update(size_add)
-                else:
-                    time_end_realtime = time.time()
-                    time_span = time_end_realtime - time_start_realtime
-                    if time_span > 1:
-                        speed_realtime = size_add / time_span
-                        tqdm.write(
-                            "  Downloading {} [Speed: {} | Size: {}]".format(
-                                file_name,
-                                _unit_formater(speed_realtime, "B/s"),
-                                _unit_formater(local_size, "B"),
-                            ),
-                            end="\r",
-                        )
-                        time_start_realtime = time_end_realtime
-            if not support_resume:
-                time_cost = time.time() - time_start
-                speed = local_size / time_cost if time_cost > 0 else 0
+            pbar = state.pbar
+            _save_validators(r, state, file_path)
+
+            # begin downloading
+            nparts = _count_parts(r, state, nparts, local_size)
+            if nparts > 1:
+                r.close()
+
+                with _parts_client(client, r, nparts) as parts_client:
+
+                    @contextmanager
+                    def open_range(start, end):
+                        with parts_client.stream(
+                            "GET",
+                            url,
+                            headers={"Range": f"bytes={start}-{end - 1}"},
+                            follow_redirects=follow_redirects,
+                            cookies=cj,
+                        ) as r_part:
+                            if r_part.status_code != 206:
+                                raise httpx.HTTPStatusError(
+                                    f"range request of {url} failed with status {r_part.status_code}",
+                                    request=r_part.request,
+                                    response=r_part,
+                                )
+                            yield r_part.iter_raw(chunk_size)
+
+                    _download_parts_sync(
+                        open_range,
+                        file_path,
+                        local_size,
+                        state.remote_size,
+                        nparts,
+                        pbar,
+                        fsync,
+                    )
+            else:
+                with _open_for_append(file_path, pbar, state.remote_size) as f:
+                    for chunk in r.iter_raw(chunk_size):
+                        f.write(chunk)
+                    if fsync:
+                        _sync_file(f)
+            pbar.close()
+            if not state.support_resume:
+                time_cost = pbar.format_dict["elapsed"]
+                speed = pbar.n / time_cost if time_cost > 0 else 0
                 tqdm.write(
                     "  Finish downloading {} [Speed: {} | Total Size: {}]".format(
                         file_name,
                         _unit_formater(speed, "B/s"),
-                        _unit_formater(local_size, "B"),
+                        _unit_formater(pbar.n, "B"),
                     )
                 )
-    return True
+            _finish_meta(r.headers, file_path, skip_complete)
+        return True
 
 
 def _download_data_requests(
@@ -384,6 +1009,10 @@ def _download_data_requests(
     follow_redirects=True,
     retry=0,
     authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
 ):
     """Download a single file.
 
@@ -403,108 +1032,140 @@ def _download_data_requests(
         the file name. If None, will parse from web response or url.
         file_name can be the absolute path if folder is None.
     client: requests.Session() object
-        client maintaining connection. Default None
+        client maintaining connection. If None, a client shared by the calls
+        without a client is used, which keeps connections alive between them.
+        Default None
     follow_redirects: bool
         Enables or disables HTTP redirects
     retry: int
         number of reconnection when status code is 503
+    chunk_size: int
+        number of bytes read from the response per iteration.
+        Default is :data:`DOWNLOAD_CHUNK_SIZE` (64 KiB)
+    fsync: bool
+        whether to call ``os.fsync`` once the file is written, which makes
+        the downloaded data durable on crash. Default is False
+    nparts: int
+        number of concurrent range requests a large file is split into, which
+        speeds up downloading from servers throttling each connection. Only
+        used if the server supports resuming and ``os.pwrite`` is available.
+        The parts of a HTTP/2 download are requested over HTTP/1.1 connections
+        of their own, as HTTP/2 would multiplex them over one connection
+    skip_complete: bool
+        whether to skip the files recorded as complete by a previous run
+        without requesting them, so a newer file on the server is not
+        detected. The request is only avoided if file_name is given, as the
+        name is otherwise parsed from the response. Default is False
     """
     # init parameters
-    global support_resume, pbar, remote_size
-
-    support_resume = False
-    headers = {"Range": "bytes=0-4"}
     if not client:
-        client = requests
+        client = _get_default_client("requests")
 
     cj = _get_cookiejar(authorize_from_browser)
 
-    r = client.get(
-        url, headers=headers, timeout=120, allow_redirects=follow_redirects, cookies=cj
-    )
-    r.close()
+    attempt = 0
+    while True:
+        local_stat = None
+        if file_name is not None:
+            file_path = _get_file_path(folder, file_name)
+            if skip_complete and _is_recorded_complete(file_path):
+                tqdm.write(f"{file_name} was downloaded entirely. skiping download")
+                return True
+            local_stat = _prepare_local_file(file_path)
+        local_size = local_stat.st_size if local_stat is not None else 0
+        range_start = local_size
+        # only resuming needs a range, which some servers handle badly
+        headers = _range_headers(file_path, range_start) if range_start else {}
+
+        with client.get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=120,
+            allow_redirects=follow_redirects,
+            cookies=cj,
+        ) as r:
+            if file_name is None:
+                file_name = _parse_file_name(r)
+                file_path = _get_file_path(folder, file_name)
+                local_stat = _prepare_local_file(file_path)
+                local_size = local_stat.st_size if local_stat is not None else 0
+
+            if _needs_range_request(r, range_start, local_size):
+                # the range was requested before the size of local file is known
+                continue
+
+            state = _handle_status(r, url, local_stat, file_name, file_path)
+            if state.action == "done":  # downloaded entirely
+                _finish_meta(r.headers, file_path, skip_complete)
+                return True
+            elif state.action == "request":  # 301,302 or local file removed
+                url = state.url
+                follow_redirects = True
+                continue
+            elif state.action == "error":
+                if retry > 0:
+                    retry -= 1
+                    r.close()
+                    time.sleep(_retry_delay(r, attempt))
+                    attempt += 1
+                    continue
+                # error! break download
+                return False
+            pbar = state.pbar
+            _save_validators(r, state, file_path)
 
-    if file_name is None:
-        file_name = _parse_file_name(r)
+            # begin downloading
+            nparts = _count_parts(r, state, nparts, local_size)
+            if nparts > 1:
+                r.close()
 
-    if folder is not None:
-        file_path = os.path.join(folder, file_name)
-    else:
-        file_path = os.path.abspath(file_name)
-
-    local_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-
-    result = _handle_status(r, url, local_size, file_name, file_path)
-    if result:
-        status, url_new = result
-        if status:  # downloaded entirely
-            return True
-        elif status == False:
-            if url_new:  # 301,302
-                return _download_data_requests(
-                    url_new,
-                    folder=folder,
-                    file_name=file_name,
-                    authorize_from_browser=authorize_from_browser,
-                    follow_redirects=True,
-                    client=client,
-                )
-            elif retry > 0:
-                return _download_data_requests(
-                    url,
-                    folder=folder,
-                    file_name=file_name,
-                    authorize_from_browser=authorize_from_browser,
-                    client=client,
-                    retry=retry - 1,
+                @contextmanager
+                def open_range(start, end):
+                    with client.get(
+                        url,
+                        headers={"Range": f"bytes={start}-{end - 1}"},
+                        stream=True,
+                        timeout=120,
+                        allow_redirects=follow_redirects,
+                        cookies=cj,
+                    ) as r_part:
+                        if r_part.status_code != 206:
+                            raise requests.HTTPError(
+                                f"range request of {url} failed with status {r_part.status_code}",
+                                response=r_part,
+                            )
+                        yield r_part.iter_content(chunk_size)
+
+                _download_parts_sync(
+                    open_range,
+                    file_path,
+                    local_size,
+                    state.remote_size,
+                    nparts,
+                    pbar,
+                    fsync,
                 )
-            else:  # error! break download
-                return False
-
-    # begin downloading
-    if support_resume:
-        headers["Range"] = f"bytes={local_size}-{remote_size}"
-    else:
-        headers = None
-
-    r = client.get(url, headers=headers, stream=True, timeout=120, cookies=cj)
-    with open(file_path, "ab") as f:
-        time_start_realtime = time_start = time.time()
-        for chunk in r.iter_content(chunk_size=1024):
-            if chunk:
-                size_add = len(chunk)
-                local_size += size_add
-                f.write(chunk)
-                f.flush()
-            if support_resume:
-                pbar.update(size_add)
             else:
-                time_end_realtime = time.time()
-                time_span = time_end_realtime - time_start_realtime
-                if time_span > 1:
-                    speed_realtime = size_add / time_span
-                    tqdm.write(
-                        "  Downloading {} [Speed: {} | Size: {}]".format(
-                            file_name,
-                            _unit_formater(speed_realtime, "B/s"),
-                            _unit_formater(local_size, "B"),
-                        ),
-                        end="\r",
+                # decode gzip/deflate like iter_content() does
+                r.raw.decode_content = True
+                with _open_for_append(file_path, pbar, state.remote_size) as f:
+                    shutil.copyfileobj(r.raw, f, chunk_size)
+                    if fsync:
+                        _sync_file(f)
+            pbar.close()
+            if not state.support_resume:
+                time_cost = pbar.format_dict["elapsed"]
+                speed = pbar.n / time_cost if time_cost > 0 else 0
+                tqdm.write(
+                    "  Finish downloading {} [Speed: {} | Total Size: {}]".format(
+                        file_name,
+                        _unit_formater(speed, "B/s"),
+                        _unit_formater(pbar.n, "B"),
                     )
-                    time_start_realtime = time_end_realtime
-        if not support_resume:
-            time_cost = time.time() - time_start
-            speed = local_size / time_cost if time_cost > 0 else 0
-            tqdm.write(
-                "  Finish downloading {} [Speed: {} | Total Size: {}]".format(
-                    file_name,
-                    _unit_formater(speed, "B/s"),
-                    _unit_formater(local_size, "B"),
                 )
-            )
-
-    r.close()
-    return True
+            _finish_meta(r.headers, file_path, skip_complete)
+        return True
 
 
 def download_data(
@@ -516,6 +1177,10 @@ def download_data(
     follow_redirects=True,
     retry=0,
     authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
 ):
     """Download a single file.
 
@@ -529,7 +1194,9 @@ def download_data(
         the file name. If None, will parse from web response or url.
         file_name can be the absolute path if folder is None.
     client: requests.Session() for `requests` engine or httpx.Client() for `httpx` engine
-        client maintaining connection. Default None
+        client maintaining connection. If None, a client shared by the calls
+        without a client is used, which keeps connections alive between them.
+        Default None
     engine: one of ["requests","httpx"]
         engine for downloading
     follow_redirects: bool
@@ -542,10 +1209,31 @@ def download_data(
         via browser (So far the following browsers are supported: Chrome,Firefox,
         Opera, Edge, Chromium"). It will be very useful when website doesn't support
         "HTTP Basic Auth". Default is False.
+    chunk_size: int
+        number of bytes read from the response per iteration.
+        Default is :data:`DOWNLOAD_CHUNK_SIZE` (64 KiB)
+    fsync: bool
+        whether to call ``os.fsync`` once the file is written, which makes
+        the downloaded data durable on crash. Default is False
+    nparts: int
+        number of concurrent range requests a large file is split into, which
+        speeds up downloading from servers throttling each connection. Only
+        used if the server supports resuming and ``os.pwrite`` is available.
+        The parts of a HTTP/2 download are requested over HTTP/1.1 connections
+        of their own, as HTTP/2 would multiplex them over one connection
+    skip_complete: bool
+        whether to skip the files recorded as complete by a previous run
+        without requesting them, so a newer file on the server is not
+        detected. The request is only avoided if file_name is given, as the
+        name is otherwise parsed from the response. Default is False
+
+    Return:
+    -------
+    True if the file is downloaded entirely, False if the download failed
     """
 
     if engine == "requests":
-        _download_data_requests(
+        return _download_data_requests(
             url,
             folder,
             file_name,
@@ -553,9 +1241,13 @@ def download_data(
             follow_redirects,
             retry,
             authorize_from_browser,
+            chunk_size,
+            fsync,
+            nparts,
+            skip_complete,
         )
     elif engine == "httpx":
-        _download_data_httpx(
+        return _download_data_httpx(
             url,
             folder,
             file_name,
@@ -563,11 +1255,21 @@ def download_data(
             follow_redirects,
             retry,
             authorize_from_browser,
+            chunk_size,
+            fsync,
+            nparts,
+            skip_complete,
         )
     else:
         raise ValueError('engine must be one of ["requests","httpx"]')
 
 
+def _sort_by_host(jobs):
+    """sort (url, file_name) pairs by the host of url, so that the connection
+    to a host is reused by its consecutive downloads"""
+    return sorted(jobs, key=lambda job: get_url_host(job[0]))
+
+
 def download_datas(
     urls,
     folder=None,
@@ -575,6 +1277,11 @@ def download_datas(
     engine="requests",
     authorize_from_browser=False,
     desc="",
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
+    limits=None,
 ):
     """download data from a list like object which containing urls.
     This function will download files one by one.
@@ -598,6 +1305,27 @@ def download_datas(
         "HTTP Basic Auth". Default is False.
     desc: str
         description of data downloading
+    chunk_size: int
+        number of bytes read from the response per iteration.
+        Default is :data:`DOWNLOAD_CHUNK_SIZE` (64 KiB)
+    fsync: bool
+        whether to call ``os.fsync`` once the file is written, which makes
+        the downloaded data durable on crash. Default is False
+    nparts: int
+        number of concurrent range requests a large file is split into, which
+        speeds up downloading from servers throttling each connection. Only
+        used if the server supports resuming and ``os.pwrite`` is available.
+        The parts of a HTTP/2 download are requested over HTTP/1.1 connections
+        of their own, as HTTP/2 would multiplex them over one connection
+    skip_complete: bool
+        whether to skip the files recorded as complete by a previous run
+        without requesting them, so a newer file on the server is not
+        detected. The request is only avoided for the files whose names are
+        given in file_names, as a name is otherwise parsed from the response.
+        Default is False
+    limits: httpx.Limits
+        limits of the connection pool of ``httpx`` engine. If None, up to 100
+        connections are kept alive. Default None
 
     Examples:
     ---------
@@ -620,35 +1348,45 @@ def download_datas(
     >>> downloader.download_datas(urls,folder)
     """
     if engine == "requests":
-        client = requests.Session()
+        client = _new_requests_session()
     elif engine == "httpx":
-        client = httpx.Client(timeout=None)
+        client = _new_httpx_client(limits)
     else:
         raise ValueError('engine must be one of ["requests","httpx"]')
 
-    desc = ">>> Total | " + desc.title()
-    for i, url in enumerate(tqdm(urls, unit="files", dynamic_ncols=True, desc=desc)):
-        if file_names is not None:
-            download_data(
-                url,
-                folder,
-                file_name=file_names[i],
-                client=client,
-                engine=engine,
-                authorize_from_browser=authorize_from_browser,
-            )
-        else:
-            download_data(
-                url,
-                folder,
-                client=client,
-                engine=engine,
-                authorize_from_browser=authorize_from_browser,
-            )
+    if file_names is None:
+        file_names = itertools.repeat(None)
+    jobs = _new_total_pbar(desc, _sort_by_host(zip(urls, file_names)))
+    for url, file_name in jobs:
+        download_data(
+            url,
+            folder,
+            file_name=file_name,
+            client=client,
+            engine=engine,
+            authorize_from_browser=authorize_from_browser,
+            chunk_size=chunk_size,
+            fsync=fsync,
+            nparts=nparts,
+            skip_complete=skip_complete,
+        )
+
+
+# client reused by the downloads of a mp_download_datas worker process
+_worker_client = None
+
+
+def _init_worker(engine, http2=True):
+    global _worker_client
+    if engine == "requests":
+        _worker_client = _new_requests_session()
+    elif engine == "httpx":
+        _worker_client = _new_httpx_client(http2=http2)
 
 
 def _mp_download_data(args):
-    return download_data(*args)
+    url, folder, file_name, *others = args
+    return download_data(url, folder, file_name, _worker_client, *others)
 
 
 def mp_download_datas(
@@ -661,9 +1399,15 @@ def mp_download_datas(
     retry=0,
     engine="requests",
     authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
+    use_processes=False,
+    http2=True,
 ):
     """download data from a list like object which containing urls.
-    This function will download multiple files simultaneously using multiprocess.
+    This function will download multiple files simultaneously.
 
     Parameters:
     -----------
@@ -672,12 +1416,12 @@ def mp_download_datas(
     folder: str
         the folder to store output files. Default current folder.
     engine: one of ["requests","httpx"]
-        engine for downloading
+        engine for downloading. Only used if use_processes is True
     file_names: iterator
         iterator contains names of files. Leaving it None if you want the program to parse
         them from website. file_names can contain the absolute paths if folder is None.
     ncore: int
-        Number of cores for parallel processing. If ncore is None then the number returned
+        Number of files downloaded simultaneously. If ncore is None then the number returned
         by os.cpu_count() is used. Default None.
     desc: str
         description of data downloading
@@ -687,6 +1431,34 @@ def mp_download_datas(
         via browser (So far the following browsers are supported: Chrome,Firefox,
         Opera, Edge, Chromium"). It will be very useful when website doesn't support
         "HTTP Basic Auth". Default is False.
+    chunk_size: int
+        number of bytes read from the response per iteration.
+        Default is :data:`DOWNLOAD_CHUNK_SIZE` (64 KiB)
+    fsync: bool
+        whether to call ``os.fsync`` once the file is written, which makes
+        the downloaded data durable on crash. Default is False
+    nparts: int
+        number of concurrent range requests a large file is split into, which
+        speeds up downloading from servers throttling each connection. Only
+        used if the server supports resuming and ``os.pwrite`` is available.
+        The parts of a HTTP/2 download are requested over HTTP/1.1 connections
+        of their own, as HTTP/2 would multiplex them over one connection
+    skip_complete: bool
+        whether to skip the files recorded as complete by a previous run
+        without requesting them, so a newer file on the server is not
+        detected. The request is only avoided for the files whose names are
+        given in file_names, as a name is otherwise parsed from the response.
+        Default is False
+    use_processes: bool
+        whether to download files in ncore processes. Downloading is bound by
+        I/O, so by default the files are downloaded by :func:`async_download_datas`
+        in this process, sharing connections and avoiding the cost of processes.
+        Default is False
+    http2: bool
+        whether to use HTTP/2 if the server supports it, which multiplexes the
+        requests to the same host over one connection. Disable it for servers
+        throttling each connection. Not used by the ``requests`` engine.
+        Default is True
 
     Examples:
     ---------
@@ -714,41 +1486,255 @@ def mp_download_datas(
         ncore = int(ncore)
     tqdm.write(f">>> {ncore} parallel downloading")
 
-    desc = ">>> Total | " + desc.title()
-    pbar = tqdm(total=len(urls), desc=desc, dynamic_ncols=True)
-
-    with mp.Pool(ncore) as pool:
-        if file_names is not None:
-            args = [
-                (
-                    urls[i],
-                    folder,
-                    file_names[i],
-                    None,
-                    engine,
-                    follow_redirects,
-                    retry,
-                    authorize_from_browser,
-                )
-                for i in range(len(urls))
-            ]  # Need to put other parameters in right places
+    if not use_processes:
+        return async_download_datas(
+            urls,
+            folder,
+            file_names,
+            limit=ncore,
+            desc=desc,
+            follow_redirects=follow_redirects,
+            retry=retry,
+            authorize_from_browser=authorize_from_browser,
+            chunk_size=chunk_size,
+            fsync=fsync,
+            nparts=nparts,
+            skip_complete=skip_complete,
+            http2=http2,
+        )
+
+    total = len(urls) if hasattr(urls, "__len__") else None
+    pbar = _new_total_pbar(desc, total=total)
+
+    if file_names is None:
+        file_names = itertools.repeat(None)
+    args = [
+        (
+            url,
+            folder,
+            file_name,
+            engine,
+            follow_redirects,
+            retry,
+            authorize_from_browser,
+            chunk_size,
+            fsync,
+            nparts,
+            skip_complete,
+        )
+        for url, file_name in _sort_by_host(zip(urls, file_names))
+    ]  # Need to put other parameters in right places
+    # consecutive urls of a host are sent to the same worker
+    chunksize = max(1, len(args) // (ncore * 4))
+
+    with mp.Pool(ncore, initializer=_init_worker, initargs=(engine, http2)) as pool:
+        for i in pool.imap_unordered(_mp_download_data, args, chunksize):
+            pbar.update()
+
+
+# event loop and clients shared by the async functions, so that connections
+# kept alive by the clients can be reused by the following calls
+_event_loop = None
+_async_clients = {}
+
+
+def _new_event_loop():
+    """create an event loop of uvloop (winloop on Windows) if it is installed,
+    which runs the loop in C and is much faster than the loop of asyncio"""
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        if sys.platform == "win32" and sys.version_info < (3, 9):
+            # solve the loop close  Error for python 3.8.x in windows platform
+            selector = selectors.SelectSelector()
+            return asyncio.SelectorEventLoop(selector)
+        # the default selector is epoll or kqueue, whose cost is independent
+        # of the number of connections unlike select()
+        return asyncio.new_event_loop()
+    return fast_loop.new_event_loop()
+
+
+def _get_event_loop():
+    """return the event loop shared by :func:`async_download_datas` and
+    :func:`status_ok`, a new one will be created if it was closed"""
+    global _event_loop
+    if _event_loop is None:
+        _event_loop = _new_event_loop()
+    elif _event_loop.is_closed():
+        _event_loop = _new_event_loop()
+        # connections of cached clients are bound to the closed loop
+        _async_clients.clear()
+    return _event_loop
+
+
+def _run_until_complete(coro):
+    """run coroutine in the shared event loop until it is done"""
+    loop = _get_event_loop()
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        # called from a running loop (e.g. Jupyter), which needs the shared
+        # loop to be re-entrant. Patched only here, as it slows down asyncio
+        if isinstance(loop, asyncio.BaseEventLoop):
+            nest_asyncio.apply(loop)
         else:
-            args = [
-                (
-                    urls[i],
-                    folder,
-                    file_names,
-                    None,
-                    engine,
-                    follow_redirects,
-                    retry,
-                    authorize_from_browser,
+            # uvloop can't be patched, so it runs in another thread instead
+            with ThreadPoolExecutor(1) as executor:
+                return executor.submit(loop.run_until_complete, coro).result()
+    return loop.run_until_complete(coro)
+
+
+def _new_async_client(limit, http2=True):
+    limits = httpx.Limits(
+        max_keepalive_connections=limit,
+        max_connections=limit,
+        keepalive_expiry=_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        http2=http2, limits=limits, timeout=_TIMEOUT, verify=_SSL_CTX
+    )
+
+
+def _get_async_client(limit, http2=True):
+    """return the cached httpx.AsyncClient for given connection limit"""
+    # the loop is created first, as replacing a closed loop drops the clients
+    _get_event_loop()
+    key = (limit, http2)
+    client = _async_clients.get(key)
+    if client is None or client.is_closed:
+        client = _new_async_client(limit, http2)
+        _async_clients[key] = client
+    return client
+
+
+@atexit.register
+def _close_event_loop():
+    if _event_loop is None or _event_loop.is_closed():
+        return
+    for client in _async_clients.values():
+        if not client.is_closed:
+            _event_loop.run_until_complete(client.aclose())
+    _async_clients.clear()
+    _event_loop.close()
+
+
+def _aiter_body(r, chunk_size):
+    """iterate over the body of response, which is decoded only if it's
+    encoded, as the raw chunks don't go through the decoders"""
+    if r.headers.get("Content-Encoding", "identity") == "identity":
+        return r.aiter_raw(chunk_size)
+    return r.aiter_bytes(chunk_size)
+
+
+def _write_head(f, buffer, n):
+    """write the first n bytes of buffer into f without copying them"""
+    with memoryview(buffer)[:n] as view:
+        f.write(view)
+
+
+async def _download_stream(r, file_path, pbar, chunk_size, fsync, size=None):
+    """append the body of response to file"""
+    # writing to disk is blocking, so it is done in the default executor
+    # with the chunks batched to avoid a thread hop per chunk. A batch is
+    # written while the next one is received into the other buffer, at most
+    # one write is pending. The two buffers are reused for all batches
+    loop = asyncio.get_running_loop()
+    buffers = (bytearray(_WRITE_BUFFER_SIZE), bytearray(_WRITE_BUFFER_SIZE))
+    buffer, n = buffers[0], 0
+    writing = None
+    f = await loop.run_in_executor(None, _open_for_append, file_path, None, size)
+    try:
+        async for chunk in _aiter_body(r, chunk_size):
+            # replaced in place, the buffer grows only if chunk overflows it
+            buffer[n : n + len(chunk)] = chunk
+            n += len(chunk)
+            if n >= _WRITE_BUFFER_SIZE:
+                if writing is not None:
+                    await writing
+                pbar.update(n)
+                writing = loop.run_in_executor(None, _write_head, f, buffer, n)
+                buffer, n = buffers[buffer is buffers[0]], 0
+        if writing is not None:
+            await writing
+        if n:
+            pbar.update(n)
+            await loop.run_in_executor(None, _write_head, f, buffer, n)
+        if fsync:
+            await loop.run_in_executor(None, _sync_file, f)
+    finally:
+        if writing is not None:
+            # the file can't be closed while it's written by another thread
+            await asyncio.gather(writing, return_exceptions=True)
+        await loop.run_in_executor(None, f.close)
+
+
+async def _write_range(r, fd, start, size, pbar, chunk_size, executor):
+    """write the first size bytes of response body into fd at offset start"""
+    loop = asyncio.get_running_loop()
+    buffer = bytearray()
+    end = start + size
+    async for chunk in _aiter_body(r, chunk_size):
+        if len(chunk) > end - start - len(buffer):
+            chunk = chunk[: end - start - len(buffer)]
+        buffer += chunk
+        if len(buffer) >= _WRITE_BUFFER_SIZE or start + len(buffer) >= end:
+            pbar.update(len(buffer))
+            await loop.run_in_executor(executor, _pwrite_all, fd, buffer, start)
+            start += len(buffer)
+            buffer.clear()
+    if start < end:
+        raise httpx.RemoteProtocolError(
+            f"incomplete range of {r.url}: {end - start} bytes missing"
+        )
+
+
+async def _download_parts(
+    client, r, url, file_path, start, end, nparts, pbar, chunk_size, fsync, **kwargs
+):
+    """download bytes [start, end) of url into file with nparts concurrent range
+    requests. r is the response streaming from start, which is closed to release
+    its connection as each part requests its own range.
+    """
+    await r.aclose()
+    loop = asyncio.get_running_loop()
+    bounds = [start + (end - start) * i // nparts for i in range(nparts + 1)]
+    executor = ThreadPoolExecutor(nparts)
+    fd = await loop.run_in_executor(executor, _open_parts_file, file_path, start, end)
+
+    async def download_part(i):
+        part_start, part_end = bounds[i], bounds[i + 1]
+        size = part_end - part_start
+        headers = {"Range": f"bytes={part_start}-{part_end - 1}"}
+        async with parts_client.stream("GET", url, headers=headers, **kwargs) as r_part:
+            if r_part.status_code != 206:
+                raise httpx.HTTPStatusError(
+                    f"range request of {url} failed with status {r_part.status_code}",
+                    request=r_part.request,
+                    response=r_part,
                 )
-                for i in range(len(urls))
-            ]
+            await _write_range(r_part, fd, part_start, size, pbar, chunk_size, executor)
 
-        for i in pool.imap_unordered(_mp_download_data, args):
-            pbar.update()
+    try:
+        async with _async_parts_client(client, r, nparts) as parts_client:
+            tasks = [loop.create_task(download_part(i)) for i in range(nparts)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        if fsync:
+            await loop.run_in_executor(executor, os.fsync, fd)
+    finally:
+        # wait for the pending writes before the fd is closed
+        await loop.run_in_executor(None, executor.shutdown)
+        await loop.run_in_executor(None, os.close, fd)
+    await loop.run_in_executor(None, os.remove, file_path + _PARTS_SUFFIX)
 
 
 async def _download_data(
@@ -759,103 +1745,127 @@ async def _download_data(
     follow_redirects=True,
     retry=0,
     authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
 ):
-    global support_resume, pbar, remote_size
+    cj = _get_cookiejar(authorize_from_browser)
 
-    headers = {"Range": "bytes=0-4"}
-    support_resume = False
+    # the file system calls block, so they are done in the default executor,
+    # as is reading the netrc file
+    loop = asyncio.get_running_loop()
+    if folder is not None:
+        await loop.run_in_executor(
+            None, functools.partial(os.makedirs, folder, exist_ok=True)
+        )
 
-    cj = _get_cookiejar(authorize_from_browser)
-    # auth = get_netrc_auth(url)
+    attempt = 0
+    while True:
+        # the url may be redirected to another host
+        auth = await loop.run_in_executor(None, get_netrc_auth, get_url_host(url))
+        local_stat = None
+        if file_name is not None:
+            file_path = _get_file_path(folder, file_name)
+            if skip_complete and await loop.run_in_executor(
+                None, _is_recorded_complete, file_path
+            ):
+                tqdm.write(f"{file_name} was downloaded entirely. skiping download")
+                return True
+            local_stat = await loop.run_in_executor(
+                None, _prepare_local_file, file_path
+            )
+        local_size = local_stat.st_size if local_stat is not None else 0
+        range_start = local_size
+        # only resuming needs a range, which some servers handle badly
+        headers = {}
+        if range_start:
+            headers = await loop.run_in_executor(
+                None, _range_headers, file_path, range_start
+            )
 
-    r = await client.get(
-        url, headers=headers, timeout=120, follow_redirects=follow_redirects, cookies=cj
-    )
-    # r.close()
-    # r = await client.head(url, headers=headers, auth=auth, timeout=120)
-    if file_name is None:
-        file_name = _parse_file_name(r)
+        async with client.stream(
+            "GET",
+            url,
+            headers=headers,
+            auth=auth,
+            follow_redirects=follow_redirects,
+            cookies=cj,
+        ) as r:
+            if file_name is None:
+                file_name = _parse_file_name(r)
+                file_path = _get_file_path(folder, file_name)
+                local_stat = await loop.run_in_executor(
+                    None, _prepare_local_file, file_path
+                )
+                local_size = local_stat.st_size if local_stat is not None else 0
 
-    if folder is not None:
-        if not os.path.exists(folder):
-            os.makedirs(folder)
-        file_path = os.path.join(folder, file_name)
-    else:
-        file_path = os.path.abspath(file_name)
-
-    local_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-
-    result = _handle_status(r, url, local_size, file_name, file_path)
-    if result:
-        status, url_new = result
-        if status:  # downloaded entirely
-            return True
-        elif status == False:
-            if url_new:  # 301,302
-                return await _download_data(
-                    client,
-                    url_new,
-                    folder=folder,
-                    authorize_from_browser=authorize_from_browser,
-                    file_name=file_name,
-                    follow_redirects=True,
+            if _needs_range_request(r, range_start, local_size):
+                # the range was requested before the size of local file is known
+                continue
+
+            # it may remove the local file to download it again
+            state = await loop.run_in_executor(
+                None, _handle_status, r, url, local_stat, file_name, file_path
+            )
+            if state.action == "done":  # downloaded entirely
+                await loop.run_in_executor(
+                    None, _finish_meta, r.headers, file_path, skip_complete
                 )
-            elif retry > 0:
-                return await _download_data(
+                return True
+            elif state.action == "request":  # 301,302 or local file removed
+                url = state.url
+                follow_redirects = True
+                continue
+            elif state.action == "error":
+                if retry > 0:
+                    retry -= 1
+                    await r.aclose()
+                    await asyncio.sleep(_retry_delay(r, attempt))
+                    attempt += 1
+                    continue
+                # error! break download
+                return False
+            pbar = state.pbar
+            await loop.run_in_executor(None, _save_validators, r, state, file_path)
+
+            # begin download
+            nparts = _count_parts(r, state, nparts, local_size)
+            if nparts > 1:
+                await _download_parts(
                     client,
+                    r,
                     url,
-                    folder=folder,
-                    authorize_from_browser=authorize_from_browser,
-                    file_name=file_name,
-                    retry=retry - 1,
+                    file_path,
+                    local_size,
+                    state.remote_size,
+                    nparts,
+                    pbar,
+                    chunk_size,
+                    fsync,
+                    auth=auth,
+                    cookies=cj,
+                    follow_redirects=follow_redirects,
                 )
-            else:  # error! break download
-                return False
-
-    # begin download
-    if support_resume:
-        headers["Range"] = f"bytes={local_size}-{remote_size}"
-    else:
-        headers = None
-    auth = get_netrc_auth(get_url_host(url))
-    async with client.stream(
-        "GET", url, headers=headers, auth=auth, timeout=None, cookies=cj
-    ) as r:
-        with open(file_path, "ab") as f:
-            time_start_realtime = time_start = time.time()
-
-            async for chunk in r.aiter_bytes():
-                size_add = len(chunk)
-                local_size += size_add
-                f.write(chunk)
-                f.flush()
-                if support_resume:
-                    pbar.update(size_add)
-                else:
-                    time_end_realtime = time.time()
-                    time_span = time_end_realtime - time_start_realtime
-                    if time_span > 1:
-                        speed_realtime = size_add / time_span
-                        tqdm.write(
-                            "Downloading {} [Speed: {} | Size: {}]".format(
-                                file_name,
-                                _unit_formater(speed_realtime, "B/s"),
-                                _unit_formater(local_size, "B"),
-                            ),
-                            end="\r",
-                        )
-                        time_start_realtime = time_end_realtime
-            if not support_resume:
-                speed = local_size / (time.time() - time_start)
+            else:
+                await _download_stream(
+                    r, file_path, pbar, chunk_size, fsync, state.remote_size
+                )
+            pbar.close()
+            if not state.support_resume:
+                time_cost = pbar.format_dict["elapsed"]
+                speed = pbar.n / time_cost if time_cost > 0 else 0
                 tqdm.write(
                     "Finish downloading {} [Speed: {} | Total Size: {}]".format(
                         file_name,
                         _unit_formater(speed, "B/s"),
-                        _unit_formater(local_size, "B"),
+                        _unit_formater(pbar.n, "B"),
                     )
                 )
-            # r.close()
-            return True
+            await loop.run_in_executor(
+                None, _finish_meta, r.headers, file_path, skip_complete
+            )
+        return True
 
 
 async def creat_tasks(
@@ -867,45 +1877,63 @@ async def creat_tasks(
     desc,
     follow_redirects,
     retry,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
+    client=None,
 ):
-    limits = httpx.Limits(max_keepalive_connections=limit, max_connections=limit)
-    async with httpx.AsyncClient(limits=limits, timeout=None, verify=False) as client:
-        if file_names is not None:
-            tasks = [
-                asyncio.ensure_future(
-                    _download_data(
-                        client,
-                        url,
-                        folder,
-                        authorize_from_browser=authorize_from_browser,
-                        file_name=file_names[i],
-                        follow_redirects=follow_redirects,
-                        retry=retry,
-                    )
-                )
-                for i, url in enumerate(urls)
-            ]
-        else:
-            tasks = [
-                asyncio.ensure_future(
-                    _download_data(
-                        client,
-                        url,
-                        folder,
-                        authorize_from_browser=authorize_from_browser,
-                        follow_redirects=follow_redirects,
-                        retry=retry,
-                    )
-                )
-                for url in urls
-            ]
+    if client is None:
+        async with _new_async_client(limit) as client:
+            return await creat_tasks(
+                urls,
+                folder,
+                authorize_from_browser,
+                file_names,
+                limit,
+                desc,
+                follow_redirects,
+                retry,
+                chunk_size,
+                fsync,
+                nparts,
+                skip_complete,
+                client,
+            )
 
-        # Total process bar
-        tasks_iter = asyncio.as_completed(tasks)
-        desc = ">>> Total | " + desc.title()
-        pbar = tqdm(tasks_iter, total=len(urls), desc=desc, dynamic_ncols=True)
-        for coroutine in pbar:
-            await coroutine
+    total = len(urls) if hasattr(urls, "__len__") else None
+    pbar = _new_total_pbar(desc, total=total)
+
+    if file_names is None:
+        file_names = itertools.repeat(None)
+    # shared by all workers, so that only `limit` downloads are alive at once
+    jobs = zip(urls, file_names)
+
+    async def worker():
+        for url, file_name in jobs:
+            await _download_data(
+                client,
+                url,
+                folder,
+                authorize_from_browser=authorize_from_browser,
+                file_name=file_name,
+                follow_redirects=follow_redirects,
+                retry=retry,
+                chunk_size=chunk_size,
+                fsync=fsync,
+                nparts=nparts,
+                skip_complete=skip_complete,
+            )
+            pbar.update()
+
+    loop = asyncio.get_running_loop()
+    workers = [loop.create_task(worker()) for _ in range(limit)]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+        pbar.close()
 
 
 def async_download_datas(
@@ -917,6 +1945,11 @@ def async_download_datas(
     follow_redirects=True,
     retry=0,
     authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
+    http2=True,
 ):
     """Download multiple files simultaneously.
 
@@ -943,6 +1976,28 @@ def async_download_datas(
         Enables or disables HTTP redirects
     retry: int
         number of reconnection when status code is 503
+    chunk_size: int
+        number of bytes read from the response per iteration.
+        Default is :data:`DOWNLOAD_CHUNK_SIZE` (64 KiB)
+    fsync: bool
+        whether to call ``os.fsync`` once the file is written, which makes
+        the downloaded data durable on crash. Default is False
+    nparts: int
+        number of concurrent range requests a large file is split into, which
+        speeds up downloading from servers throttling each connection. Only
+        used if the server supports resuming and ``os.pwrite`` is available.
+        The parts of a HTTP/2 download are requested over HTTP/1.1 connections
+        of their own, as HTTP/2 would multiplex them over one connection
+    skip_complete: bool
+        whether to skip the files recorded as complete by a previous run
+        without requesting them, so a newer file on the server is not
+        detected. The request is only avoided for the files whose names are
+        given in file_names, as a name is otherwise parsed from the response.
+        Default is False
+    http2: bool
+        whether to use HTTP/2 if the server supports it, which multiplexes the
+        requests to the same host over one connection. Disable it for servers
+        throttling each connection. Default is True
 
     Example:
     ---------
@@ -964,54 +2019,126 @@ def async_download_datas(
     
     >>> downloader.async_download_datas(urls,folder,None,desc='interferograms')
     """
-    # solve the loop close  Error for python 3.8.x in windows platform
-    selector = selectors.SelectSelector()
-    loop = asyncio.SelectorEventLoop(selector)
-    try:
-        loop.run_until_complete(
-            creat_tasks(
-                urls,
-                folder,
-                authorize_from_browser,
-                file_names,
-                limit,
-                desc,
-                follow_redirects,
-                retry,
-            )
+    _run_until_complete(
+        async_download_datas_async(
+            urls,
+            folder,
+            file_names,
+            limit,
+            desc,
+            follow_redirects,
+            retry,
+            authorize_from_browser,
+            chunk_size,
+            fsync,
+            nparts,
+            skip_complete,
+            client=_get_async_client(limit, http2),
         )
-    finally:
-        loop.close()
+    )
+
+
+async def async_download_datas_async(
+    urls,
+    folder=None,
+    file_names=None,
+    limit=30,
+    desc="",
+    follow_redirects=True,
+    retry=0,
+    authorize_from_browser=False,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    fsync=False,
+    nparts=1,
+    skip_complete=False,
+    client=None,
+):
+    """The coroutine version of :func:`async_download_datas`, which can be
+    awaited in a running event loop. Passing the same ``client`` to multiple
+    calls will reuse its connections.
+
+    Parameters:
+    -----------
+    urls, folder, file_names, limit, desc, follow_redirects, retry, authorize_from_browser, chunk_size, fsync, nparts:
+        same as :func:`async_download_datas`
+    client: httpx.AsyncClient
+        client maintaining connections. If None, a new client will be created
+        and closed when all files are downloaded. Default None
+
+    Example:
+    ---------
+
+    >>> import httpx
+    >>> from data_downloader import downloader
+    >>> async with httpx.AsyncClient(timeout=None) as client:
+    ...     await downloader.async_download_datas_async(urls, folder, client=client)
+    """
+    await creat_tasks(
+        urls,
+        folder,
+        authorize_from_browser,
+        file_names,
+        limit,
+        desc,
+        follow_redirects,
+        retry,
+        chunk_size,
+        fsync,
+        nparts,
+        skip_complete,
+        client,
+    )
 
 
 async def _is_response_staus_ok(client, url, authorize_from_browser, timeout):
     cj = _get_cookiejar(authorize_from_browser)
     try:
-        r = await client.head(url, timeout=timeout, cookies=cj)
-        r.close()
-        if r.status_code == httpx.codes.OK:
-            return True
-        else:
-            return False
-    except:
+        # the response of HEAD has no body, so it is read entirely and its
+        # connection is returned to the pool already
+        r = await client.head(url, timeout=timeout, cookies=cj, follow_redirects=True)
+    except (httpx.HTTPError, httpx.InvalidURL):
         return False
+    # a redirected url is accessible if its final location is
+    return r.is_success
+
+
+async def creat_tasks_status_ok(
+    urls, limit, authorize_from_browser, timeout, client=None
+):
+    if client is None:
+        async with _new_async_client(limit) as client:
+            return await creat_tasks_status_ok(
+                urls, limit, authorize_from_browser, timeout, client
+            )
 
+    # shared by all workers, so that only `limit` tasks are alive at once
+    # instead of one for every url
+    jobs = enumerate(urls)
+    # one byte for each url, instead of a Python object
+    results = bytearray()
 
-async def creat_tasks_status_ok(urls, limit, authorize_from_browser, timeout):
-    limits = httpx.Limits(max_keepalive_connections=limit, max_connections=limit)
-    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
-        tasks = [
-            asyncio.create_task(
-                _is_response_staus_ok(client, url, authorize_from_browser, timeout)
+    async def worker():
+        for i, url in jobs:
+            ok = await _is_response_staus_ok(
+                client, url, authorize_from_browser, timeout
             )
-            for url in urls
-        ]
-        status_ok = await asyncio.gather(*tasks)
+            if i >= len(results):
+                results.extend(bytes(i + 1 - len(results)))
+            results[i] = ok
+
+    loop = asyncio.get_running_loop()
+    workers = [loop.create_task(worker()) for _ in range(limit)]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+    status_ok = np.frombuffer(results, dtype=bool)
 
     return status_ok
 
 
-def status_ok(urls, limit=200, authorize_from_browser=False, timeout=60):
+def status_ok(urls, limit=200, authorize_from_browser=False, timeout=60, http2=True):
     """Simultaneously detecting whether the given links are accessible.
 
     Parameters
@@ -1028,10 +2155,15 @@ def status_ok(urls, limit=200, authorize_from_browser=False, timeout=60):
         "HTTP Basic Auth". Default is False.
     timeout: int
         Request to stop waiting for a response after a given number of seconds
+    http2: bool
+        whether to use HTTP/2 if the server supports it, which multiplexes the
+        requests to the same host over one connection. Disable it for servers
+        throttling each connection. Default is True
 
     Return:
     ------
-    a list of results (True or False)
+    a numpy array of results (True or False), which can be used to index
+    the array of urls
 
     Example:
     -------
@@ -1050,15 +2182,14 @@ def status_ok(urls, limit=200, authorize_from_browser=False, timeout=60):
     tqdm.write(urls_accessible)
     ```
     """
-    # solve the loop close  Error for python 3.8.x in windows platform
-    selector = selectors.SelectSelector()
-    loop = asyncio.SelectorEventLoop(selector)
-    try:
-        status_ok = loop.run_until_complete(
-            creat_tasks_status_ok(urls, limit, authorize_from_browser, timeout)
+    status_ok = _run_until_complete(
+        creat_tasks_status_ok(
+            urls,
+            limit,
+            authorize_from_browser,
+            timeout,
+            client=_get_async_client(limit, http2),
         )
-    # Zero-sleep to allow underlying connections to close
-    finally:
-        loop.close()
+    )
 
     return status_ok
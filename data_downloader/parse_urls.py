@@ -1,16 +1,40 @@
 from __future__ import annotations
 
+import functools
+import os
 import warnings
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Union
 from urllib.parse import urljoin
-from xml.dom.minidom import parse
+from xml.etree.ElementTree import iterparse
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
 
 from data_downloader.downloader import get_netrc_auth, get_url_host
 
+# number of pages requested concurrently when parsing in depth
+_MAX_WORKERS = 16
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    """session shared by the functions of this module, so that connections
+    to a host are reused. Its pool fits the threads parsing pages in depth"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_MAX_WORKERS, pool_maxsize=_MAX_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+if hasattr(os, "register_at_fork"):
+    # connections of the parent process can't be shared by a forked child
+    os.register_at_fork(after_in_child=_get_session.cache_clear)
+
 
 def from_file(url_file: str | Path) -> list:
     """parse urls from a file which only contains urls
@@ -27,7 +51,7 @@ def from_file(url_file: str | Path) -> list:
     a list contains urls
     """
     with open(url_file) as f:
-        urls = [i.strip() for i in f.readlines()]
+        urls = [url for url in map(str.strip, f) if url]
     return urls
 
 
@@ -68,16 +92,63 @@ def from_sentinel_meta4(url_file: str | Path) -> list:
     -------
     a list contains urls
     """
-    data = parse(url_file).documentElement
-    urls = [i.childNodes[0].nodeValue for i in data.getElementsByTagName("url")]
+    urls = []
+    # stream the elements instead of building the DOM of the whole file
+    for _, elem in iterparse(url_file):
+        # tags are qualified by the namespace of metalink, e.g. {ns}url
+        if elem.tag.rpartition("}")[2] == "url":
+            urls.append(elem.text)
+        elem.clear()
     return urls
 
 
+def _parse_links(r: requests.Response, url: str) -> list:
+    """extract the absolute urls of all links (``<a href>``) in the html of
+    response, walking the tree of lxml directly"""
+    # use the charset of server if given, otherwise detect it from the page
+    charset = "charset" in r.headers.get("Content-Type", "")
+    encoding = r.encoding if charset else None
+    # lxml refuses to parse an empty document
+    if not r.content.strip():
+        return []
+    parser = lxml_html.HTMLParser(encoding=encoding)
+    doc = lxml_html.fromstring(r.content, parser=parser)
+    doc.make_links_absolute(url)
+    return [
+        link
+        for el, attr, link, _ in doc.iterlinks()
+        if el.tag == "a" and attr == "href"
+    ]
+
+
+def _match_suffix(url: str, suffix: Optional[list], suffix_depth: int) -> bool:
+    """whether the suffixes of file in url match the given suffix. The same as
+    ``Path(url).suffixes[-suffix_depth:] == suffix``, without creating a Path"""
+    if not suffix:
+        return True
+    name = url.rstrip("/").rpartition("/")[2]
+    if name.endswith("."):
+        return False
+    suffixes = ["." + i for i in name.lstrip(".").split(".")[1:]]
+    return suffixes[-suffix_depth:] == suffix
+
+
+def _parse_page(client: requests.Session, url: str) -> Optional[list]:
+    """return the urls linked by the page, or None if url is not a html page"""
+    # the body is only read if the page is html, so data files are not
+    # downloaded, without a separate HEAD request
+    with client.get(url, stream=True) as r:
+        if "text/html" not in r.headers.get("Content-Type", ""):
+            return None
+        return _parse_links(r, url)
+
+
 def from_html(
     url: str,
     suffix: Optional[str] = None,
     suffix_depth: int = 0,
     url_depth: int = 0,
+    client: Optional[requests.Session] = None,
 ) -> list:
     """parse urls from html website
 
@@ -100,6 +171,10 @@ def from_html(
         Number of suffixes
     url_depth: int
         depth of url in website will parsed
+    client: requests.Session() object
+        client maintaining connection, which is reused by the pages parsed
+        in depth. If None, a session shared by the calls without a client is
+        used. Default None
 
     Return:
     -------
@@ -115,49 +190,55 @@ def from_html(
     >>> print(len(urls_all)-len(urls))
     """
 
-    def match_suffix(href, suffix):
-        if suffix:
-            sf = Path(href).suffixes[-suffix_depth:]
-            return suffix == sf
-        else:
-            return True
-
-    r_h = requests.head(url)
-    if "text/html" in r_h.headers["Content-Type"]:
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        a = soup.find_all("a")
-        urls_all = [urljoin(url, i["href"]) for i in a if i.has_attr("href")]
-        urls = [i for i in urls_all if match_suffix(i, suffix)]
-        if url_depth > 0:
-            urls_notdata = sorted(set(urls_all) - set(urls))
-            urls_depth = [
-                from_html(_url, suffix, suffix_depth, url_depth - 1)
-                for _url in urls_notdata
-            ]
-
-            for u in urls_depth:
-                if isinstance(u, list):
-                    urls.extend(u)
+    if suffix:
+        suffix = list(suffix)
 
-        return sorted(set(urls))
+    if not client:
+        client = _get_session()
 
+    urls_all = _parse_page(client, url)
+    if urls_all is None:
+        return None
+    urls = [i for i in urls_all if _match_suffix(i, suffix, suffix_depth)]
+    if url_depth <= 0:
+        return sorted(set(urls))
 
-def _retrieve_all_orders(url_host, email, auth):
+    # pages are parsed level by level, with the pages of a level requested
+    # concurrently. A page already parsed is not parsed again.
+    visited = {url}
+    pages = sorted(set(urls_all) - set(urls))
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        for _ in range(url_depth):
+            visited.update(pages)
+            results = executor.map(lambda u: _parse_page(client, u), pages)
+            pages_next = set()
+            for urls_page in results:
+                if urls_page is None:
+                    continue
+                urls_data = [
+                    i for i in urls_page if _match_suffix(i, suffix, suffix_depth)
+                ]
+                urls.extend(urls_data)
+                pages_next.update(set(urls_page) - set(urls_data))
+            pages = sorted(pages_next - visited)
+
+    return sorted(set(urls))
+
+
+def _retrieve_all_orders(client, url_host, email, auth):
     filters = {"status": "complete"}
     url = urljoin(url_host, f"/api/v1/list-orders/{email}")
-    r = requests.get(url, params=filters, auth=auth)
+    r = client.get(url, params=filters, auth=auth)
     r.raise_for_status()
     all_orders = r.json()
 
     return all_orders
 
 
-def _retrieve_urls_from_order(url_host, orderid, auth):
+def _retrieve_urls_from_order(client, url_host, orderid, auth):
     filters = {"status": "complete"}
     url = urljoin(url_host, f"/api/v1/item-status/{orderid}")
-    r = requests.get(url, params=filters, auth=auth)
+    r = client.get(url, params=filters, auth=auth)
     r.raise_for_status()
     urls_info = r.json()
     if isinstance(urls_info, dict):
@@ -234,21 +315,23 @@ def from_EarthExplorer_order(
     elif not auth:
         auth = (username, passwd)
 
+    # one connection is reused by all the requests to the host
+    client = _get_session()
+
     # refine oders
     if not order:
-        orders = _retrieve_all_orders(url_host, email, auth)
+        orders = _retrieve_all_orders(client, url_host, email, auth)
     else:
         if isinstance(order, str):
             orders = [order]
+        elif isinstance(order, Iterable):
+            orders = list(order)
         else:
-            try:
-                orders = list(order)
-            except:
-                raise ValueError("order must be str or list of str")
+            raise ValueError("order must be str or list of str")
 
     urls_info = {}
     for odr in orders:
-        urls = _retrieve_urls_from_order(url_host, odr, auth)
+        urls = _retrieve_urls_from_order(client, url_host, odr, auth)
         if urls:
             urls_info.update({odr: urls})
         else:
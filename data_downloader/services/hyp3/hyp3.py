@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import operator
 import sys
 import warnings
 import zipfile
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 from time import sleep
 
@@ -68,8 +70,29 @@ class Jobs:
     """A class to manage HyP3 jobs. It provides a pythonic interface to filter
     and select jobs using the numpy and pandas libraries. This class is designed
     to be used as the jobs attribute of the HyP3Service class.
+
+    The arrays of attributes and the frame are built on first access and
+    cached, as the jobs of an instance do not change.
     """
 
+    # attributes of jobs, in the order returned by _retrieve_jobs
+    _attrs = (
+        "job_id",
+        "job_type",
+        "request_time",
+        "status_code",
+        "user_id",
+        "name",
+        "job_parameters",
+        "files",
+        "logs",
+        "browse_images",
+        "thumbnail_images",
+        "expiration_time",
+        "processing_times",
+        "credit_cost",
+    )
+
     def __init__(self, jobs: list[sdk.Job]) -> None:
         """Initialize the Jobs class
 
@@ -123,48 +146,14 @@ class Jobs:
     def __getitem__(self, key):
         return Jobs(self.jobs[key])
 
-    def _retrieve_jobs(self) -> list[sdk.Job]:
-        """Retrieve jobs based on job type and status code
-
-        Parameters
-        ----------
-        job_type : Literal[job_type]
-            Job type to filter by
-        status_code : Literal[status_code]
-            Status code to filter by
-        """
-        """Convert the jobs to a pandas DataFrame"""
-        job_id = []
-        job_type = []
-        request_time = []
-        status_code = []
-        user_id = []
-        name = []
-        job_parameters = []
-        files = []
-        logs = []
-        browse_images = []
-        thumbnail_images = []
-        expiration_time = []
-        processing_times = []
-        credit_cost = []
-        for job in self.jobs:
-            job_id.append(job.job_id)
-            job_type.append(job.job_type)
-            request_time.append(job.request_time)
-            status_code.append(job.status_code)
-            user_id.append(job.user_id)
-            name.append(job.name)
-            job_parameters.append(job.job_parameters)
-            files.append(self._retrieve_files(job.files))
-            logs.append(self._retrieve_list(job.logs))
-            browse_images.append(self._retrieve_list(job.browse_images))
-            thumbnail_images.append(self._retrieve_list(job.thumbnail_images))
-            expiration_time.append(job.expiration_time)
-            processing_times.append(self._retrieve_list(job.processing_times))
-            credit_cost.append(job.credit_cost)
-
-        return (
+    def _retrieve_jobs(self) -> tuple[tuple, ...]:
+        """Retrieve the attributes of all jobs in one pass, one column for
+        each attribute"""
+        get_attrs = operator.attrgetter(*self._attrs)
+        columns = list(zip(*map(get_attrs, self.jobs)))
+        if not columns:
+            columns = [()] * len(self._attrs)
+        (
             job_id,
             job_type,
             request_time,
@@ -179,6 +168,23 @@ class Jobs:
             expiration_time,
             processing_times,
             credit_cost,
+        ) = columns
+
+        return (
+            job_id,
+            job_type,
+            request_time,
+            status_code,
+            user_id,
+            name,
+            job_parameters,
+            tuple(map(self._retrieve_files, files)),
+            tuple(map(self._retrieve_list, logs)),
+            tuple(map(self._retrieve_list, browse_images)),
+            tuple(map(self._retrieve_list, thumbnail_images)),
+            expiration_time,
+            tuple(map(self._retrieve_list, processing_times)),
+            credit_cost,
         )
 
     def _retrieve_list(self, val: list | None) -> str | None:
@@ -204,87 +210,87 @@ class Jobs:
             return dict_null
         return files[0]
 
-    @property
+    @cached_property
     def job_type(self) -> np.ndarray:
         """the job type of all jobs"""
         return np.array(self._job_type, dtype=np.str_)
 
-    @property
+    @cached_property
     def job_id(self) -> np.ndarray:
         """the job ID of all jobs"""
         return np.array(self._job_id, dtype=np.str_)
 
-    @property
+    @cached_property
     def request_time(self) -> np.ndarray:
         """the request time of all jobs"""
         return np.array(self._request_time, dtype="M8[D]")
 
-    @property
+    @cached_property
     def status_code(self) -> np.ndarray:
         """the status code of all jobs"""
         return np.array(self._status_code, dtype=np.str_)
 
-    @property
+    @cached_property
     def user_id(self) -> np.ndarray:
         """the user ID of all jobs"""
         return np.array(self._user_id, dtype=np.str_)
 
-    @property
+    @cached_property
     def name(self) -> np.ndarray:
         """the name of all jobs"""
         return np.array(self._name, dtype=np.str_)
 
-    @property
+    @cached_property
     def job_parameters(self) -> np.ndarray:
         """the job parameters of all jobs"""
         return np.array(self._job_parameters, dtype="O")
 
-    @property
+    @cached_property
     def files(self) -> np.ndarray:
         """the files of all jobs"""
         return np.array(self._files, dtype="O")
 
-    @property
+    @cached_property
     def file_names(self) -> np.ndarray:
         """the file names of all jobs"""
         return np.array([file["filename"] for file in self._files])
 
-    @property
+    @cached_property
     def file_urls(self) -> np.ndarray:
         """the file urls of all jobs"""
         return np.array([file["url"] for file in self._files])
 
-    @property
+    @cached_property
     def file_sizes(self) -> np.ndarray:
         """the file sizes of all jobs"""
         return np.array([file["size"] for file in self._files])
 
-    @property
+    @cached_property
     def logs(self) -> np.ndarray:
         """the logs of all jobs"""
         return np.array(self._logs, dtype=np.str_)
 
-    @property
+    @cached_property
     def browse_images(self) -> np.ndarray:
         """the browse images of all jobs"""
         return np.array(self._browse_images)
 
-    @property
+    @cached_property
     def thumbnail_images(self) -> np.ndarray:
         """the thumbnail images of all jobs"""
         return np.array(self._thumbnail_images, dtype=np.str_)
 
-    @property
+    @cached_property
     def expiration_time(self) -> np.ndarray:
         """the expiration time of all jobs"""
         return np.array(self._expiration_time, dtype="M8[D]")
 
-    @property
+    @cached_property
     def processing_times(self) -> np.ndarray:
         """the processing times of all jobs"""
         return np.array(self._processing_times, dtype=np.str_)
 
-    @property
+    @cached_property
     def credit_cost(self) -> np.ndarray:
         """the credit cost of all jobs"""
         return np.array(self._credit_cost, dtype=np.float32)
@@ -292,9 +298,9 @@ class Jobs:
     @property
     def total_credit_cost(self) -> int:
         """the total credit cost of all jobs"""
-        return np.nansum(self.credit_cost)
+        return sum(c for c in self._credit_cost if c is not None)
 
-    @property
+    @cached_property
     def frame(self) -> pd.DataFrame:
         """jobs in the form of a pandas DataFrame"""
         df = pd.DataFrame(
@@ -349,28 +355,33 @@ class Jobs:
                 f"Invalid status code: {status_code}. Valid status codes are: {STATUS_CODE.variables()}"
             )
 
-        mask = np.ones(len(self.frame), dtype=bool)
+        # masks of the conditions, combined in one pass at the end
+        masks = []
         if request_time is not None:
             if isinstance(request_time, slice):
                 if request_time.start is not None:
                     start = self._ensure_datetime(request_time.start)
+                    masks.append(self.request_time >= start)
                 if request_time.stop is None:
                     end = datetime.now().date()
                 else:
                     end = self._ensure_datetime(request_time.stop)
-                mask = (self.request_time >= start) & (self.request_time <= end)
+                masks.append(self.request_time <= end)
             if isinstance(request_time, str):
                 request_time = self._ensure_datetime(request_time)
-                mask = self.request_time == request_time
             if isinstance(request_time, datetime):
-                mask = self.request_time == request_time
+                masks.append(self.request_time == request_time)
 
         if name is not None:
-            mask = (self.name == name) & mask
+            masks.append(self.name == name)
         if job_type is not None:
-            mask = (self.job_type == job_type) & mask
+            masks.append(self.job_type == job_type)
         if status_code is not None:
-            mask = (self.status_code == status_code) & mask
+            masks.append(self.status_code == status_code)
+
+        mask = np.ones(len(self.jobs), dtype=bool)
+        if masks:
+            np.logical_and.reduce(masks, out=mask)
 
         return Jobs(self.jobs[mask])
 
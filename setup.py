@@ -14,17 +14,26 @@ setuptools.setup(
     url="https://github.com/Fanchengyan/data_downloader",
     packages=setuptools.find_packages(),
     install_requires=[
-        "httpx >= 0.4.0",
+        "httpx[http2] >= 0.18.0",
         "requests",
         "tqdm",
         "setuptools",
-        "beautifulsoup4",
+        "lxml",
         "nest_asyncio",
         "python-dateutil",
         "browser-cookie3",
+        "certifi",
         "hyp3_sdk",
         "pandas",
+        "numpy",
     ],
+    extras_require={
+        # faster event loops for the async downloaders
+        "speedups": [
+            'uvloop; sys_platform != "win32"',
+            'winloop; sys_platform == "win32"',
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",